@@ -25,9 +25,15 @@ app.config['GRAPHS'] = [GraphGeneration.create_duration_graph,
                         GraphGeneration.skillshots_v_abilities,
                         GraphGeneration.position_played]
 
+# Race account lookups across every regional cluster instead of only asking the nearest one.
+# Each uncached search then costs one account-v1 call per cluster (three), and searches for riot ids
+# that don't exist are never cached, so they cost three calls every time. Leave this off on a
+# development key, the extra calls use up its rate limit quickly.
+app.config['RACE_LOOKUPS'] = os.getenv("RACE_LOOKUPS", "false").lower() == "true"
+
 # Create an instance of Riot and LoL watcher to pass around
-riot_api = RiotWatcher(api_key=os.getenv("RIOT_API_KEY"))
-league_api = LolWatcher(api_key=os.getenv("RIOT_API_KEY"))
+riot_api = RiotWatcher(api_key=os.getenv("RIOT_API_KEY"), timeout=constants.api_timeout)
+league_api = LolWatcher(api_key=os.getenv("RIOT_API_KEY"), timeout=constants.api_timeout)
 
 
 # Render the homepage upon entering the site
@@ -57,7 +63,7 @@ def user_search(summoner_name, tagline, region):
     # Try to query the Riot API for their player information
     try:
         player = Summoner.from_game_name(lol_watcher=league_api, riot_watcher=riot_api, game_name=summoner_name,
-                                         tag_line=tagline, region=region)
+                                         tag_line=tagline, region=region, race=app.config['RACE_LOOKUPS'])
         player_info = player.get_summoner_info()
     except CustomError as e:
         abort(e.args[0], e.args[1])
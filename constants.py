@@ -16,3 +16,50 @@ regions = {
     "Taiwan": "TW2",
     "Vietnam": "VN2"
 }
+
+# Seconds to wait on a single Riot API request before giving up on it
+api_timeout = 10
+
+# Nearest regional cluster for each platform's account-v1 lookups. Account data is global,
+# so any cluster can answer, but the closest one answers fastest. There is no "sea" cluster
+# for account-v1, so Southeast Asian platforms use "asia".
+# Source: https://developer.riotgames.com/docs/lol#routing-values
+account_clusters = {
+    "NA1": "americas",
+    "BR1": "americas",
+    "LA1": "americas",
+    "LA2": "americas",
+    "EUW1": "europe",
+    "EUN1": "europe",
+    "TR1": "europe",
+    "RU": "europe",
+    "KR": "asia",
+    "JP1": "asia",
+    "OC1": "asia",
+    "PH2": "asia",
+    "SG2": "asia",
+    "TH2": "asia",
+    "TW2": "asia",
+    "VN2": "asia"
+}
+
+# Regional cluster that stores each platform's match-v5 data. Unlike account-v1,
+# matches can only be found on the cluster that owns the platform.
+match_clusters = {
+    "NA1": "americas",
+    "BR1": "americas",
+    "LA1": "americas",
+    "LA2": "americas",
+    "EUW1": "europe",
+    "EUN1": "europe",
+    "TR1": "europe",
+    "RU": "europe",
+    "KR": "asia",
+    "JP1": "asia",
+    "OC1": "sea",
+    "PH2": "sea",
+    "SG2": "sea",
+    "TH2": "sea",
+    "TW2": "sea",
+    "VN2": "sea"
+}
@@ -1,10 +1,104 @@
 import os
 import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from requests.exceptions import RequestException
 from riotwatcher import RiotWatcher, LolWatcher, ApiError
 import constants
 import LolMatch
 from GraphGeneration import CustomError
 
+# Account cluster that won the last race for a given puuid or riot id, so repeat lookups skip the race.
+# Flask keeps this process alive indefinitely, so the cache is capped and the least recently used entry
+# is dropped once it is full. Each race adds at most two entries (riot id and puuid).
+_AFFINITY_LIMIT = 1024
+_cluster_affinity = OrderedDict()
+_affinity_lock = Lock()
+
+_ALL_ACCOUNT_CLUSTERS = list(dict.fromkeys(constants.account_clusters.values()))
+
+
+def _is_conclusive(error: Exception) -> bool:
+    """
+    Checks whether an error from one account cluster would be the same on every cluster. Account-v1 data is
+    global, so a 4xx (not found, bad key, etc.) is final. Rate limits (429), 5xx and transport errors are not.
+    :param error: exception raised by the lookup
+    :return: True if asking another cluster cannot change the result
+    """
+    if not isinstance(error, ApiError) or error.response is None:
+        return False
+    return 400 <= error.response.status_code < 500 and error.response.status_code != 429
+
+
+def _remember_cluster(key: str, cluster: str):
+    """
+    Records the cluster that answered for a puuid or riot id, evicting the oldest entry when full
+    :param key: puuid or riot id
+    :param cluster: cluster that answered first
+    """
+    with _affinity_lock:
+        _cluster_affinity[key] = cluster
+        _cluster_affinity.move_to_end(key)
+        if len(_cluster_affinity) > _AFFINITY_LIMIT:
+            _cluster_affinity.popitem(last=False)
+
+
+def _account_lookup(lookup, platform: str, affinity_key: str, race: bool) -> dict:
+    """
+    Runs an account-v1 lookup on the nearest cluster, or on every cluster at once keeping the first success
+    :param lookup: function that takes a cluster name and returns the account dictionary
+    :param platform: Platform the summoner plays on ex. NA1
+    :param affinity_key: puuid or riot id used to remember which cluster answered
+    :param race: whether to query all clusters at once instead of only the nearest one
+    :return: account dictionary with puuid, gameName and tagLine
+    """
+    nearest = constants.account_clusters.get(platform.upper(), "americas")
+    if not race:
+        return lookup(nearest)
+
+    with _affinity_lock:
+        cached = _cluster_affinity.get(affinity_key)
+    if cached is not None:
+        try:
+            account = lookup(cached)
+        except (ApiError, RequestException) as e:
+            # 4xx errors (including 429) are re-raised, another cluster would give the same answer or add load
+            if isinstance(e, ApiError) and e.response is not None and e.response.status_code < 500:
+                raise
+            # The cluster stopped answering, forget it and race the others instead
+            with _affinity_lock:
+                _cluster_affinity.pop(affinity_key, None)
+        else:
+            _remember_cluster(affinity_key, cached)
+            return account
+
+    clusters = [cluster for cluster in [nearest] + _ALL_ACCOUNT_CLUSTERS if cluster != cached]
+    # dict.fromkeys removes the duplicate nearest cluster while keeping order
+    clusters = list(dict.fromkeys(clusters))
+    # A pool per race, so this race never waits behind the losing requests of an earlier one
+    executor = ThreadPoolExecutor(max_workers=len(clusters))
+    futures = {executor.submit(lookup, cluster): cluster for cluster in clusters}
+    account, winner, errors = None, None, {}
+    try:
+        for future in as_completed(futures, timeout=constants.api_timeout):
+            if future.exception() is None:
+                account, winner = future.result(), futures[future]
+                break
+            # A 4xx from one cluster is the answer from all of them, no need to wait for the rest
+            if _is_conclusive(future.exception()):
+                raise future.exception()
+            errors[futures[future]] = future.exception()
+    finally:
+        # Don't wait on the slower clusters once we have an answer
+        executor.shutdown(wait=False, cancel_futures=True)
+    if winner is None:
+        # Every cluster failed, report the error from the one we would normally have asked
+        raise errors[clusters[0]]
+    _remember_cluster(affinity_key, winner)
+    _remember_cluster(account['puuid'], winner)
+    return account
+
 
 class Summoner:
 
@@ -27,23 +121,28 @@ class Summoner:
         self.__tag_line = tag_line
         # Temporary workaround for sometimes input is, for example, "KR", but "KR" does not map anywhere, will fix when frontend is up
         self.__region = constants.regions[region] if region in constants.regions else region
+        # Match-v5 is only served by the regional cluster that owns the platform
+        self.__match_cluster = constants.match_clusters.get(self.__region.upper(), "americas")
 
     # Idea to use class method to create two possible types of the same class
     # We can create a player class using either the PUUID or the game name + tag line of a player
     # Source: ChatGPT
     @classmethod
-    def from_puuid(cls, lol_watcher: LolWatcher, riot_watcher: RiotWatcher, puuid: str, region: str):
+    def from_puuid(cls, lol_watcher: LolWatcher, riot_watcher: RiotWatcher, puuid: str, region: str,
+                   race: bool = False):
         """
         Creates an instance of the summoner with the given puuid and region
         :param lol_watcher: LolWatcher instance to perform queries
         :param riot_watcher: RiotWatcher instance to perform queries
         :param puuid: PUUID of the summoner
         :param region: Region/server of the summoner
+        :param race: Query every regional cluster at once and use the first to respond
         :return: Summoner object
         """
+        platform = constants.regions[region] if region in constants.regions else region
         try:
-            summoner = riot_watcher.account.by_puuid(
-                puuid=puuid, region="americas")
+            summoner = _account_lookup(lambda cluster: riot_watcher.account.by_puuid(puuid=puuid, region=cluster),
+                                       platform=platform, affinity_key=puuid, race=race)
         except ApiError as e:
             # Exception chaining
             # Source: https://stackoverflow.com/questions/696047/re-raise-exception-with-a-different-type-and-message-preserving-existing-inform
@@ -56,7 +155,7 @@ class Summoner:
 
     @classmethod
     def from_game_name(cls, lol_watcher: LolWatcher, riot_watcher: RiotWatcher, game_name: str, tag_line: str,
-                       region: str):
+                       region: str, race: bool = False):
         """
         Creates an instance of the summoner class using the given game name and tag line and region
         :param lol_watcher: LolWatcher instance to perform queries
@@ -64,11 +163,15 @@ class Summoner:
         :param game_name: In game name of the summoner
         :param tag_line: The tag line of the summoner
         :param region: Region/server of the summoner
+        :param race: Query every regional cluster at once and use the first to respond
         :return: Summoner object
         """
+        platform = constants.regions[region] if region in constants.regions else region
         try:
-            summoner = riot_watcher.account.by_riot_id(
-                game_name=game_name, tag_line=tag_line, region="americas")
+            summoner = _account_lookup(
+                lambda cluster: riot_watcher.account.by_riot_id(game_name=game_name, tag_line=tag_line,
+                                                                region=cluster),
+                platform=platform, affinity_key=f"{game_name}#{tag_line}".lower(), race=race)
         except ApiError as e:
             # Convert error response to a dictionary that we can access
             err_dct = json.loads(e.response.text)
@@ -102,7 +205,7 @@ class Summoner:
         :return: list of match_ids
         """
         try:
-            return self.__lol_watcher.match.matchlist_by_puuid(puuid=self.__summoner_puuid, region=self.__region)
+            return self.__lol_watcher.match.matchlist_by_puuid(puuid=self.__summoner_puuid, region=self.__match_cluster)
         except ApiError as e:
             raise CustomError(400, e.args[0]) from e
         except Exception as e:
@@ -136,6 +239,13 @@ class Summoner:
         """
         return self.__region
 
+    def match_cluster(self) -> str:
+        """
+        Returns the regional cluster that stores the summoner's matches. Ex. americas
+        :return: summoner's match cluster
+        """
+        return self.__match_cluster
+
     def export_json(self, matches: list, data_directory: str, league_api: LolWatcher):
         """
         Creates a JSON representation of the summoner's account
@@ -154,7 +264,7 @@ class Summoner:
         for match in matches:
             try:
                 json_file[match] = LolMatch.get_match_details(
-                    lol_watcher=league_api, match_id=match, region=self.region())  # dict
+                    lol_watcher=league_api, match_id=match, region=self.match_cluster())  # dict
 
                 for i, participant in enumerate(json_file[match]['metadata']['participants']):
                     # Finds the index of summoner to filter for summoner's match information